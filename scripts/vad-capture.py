@@ -15,10 +15,11 @@ task-completion notification that wakes the teammate.
 """
 
 import argparse
-import io
+import math
 import os
+import struct
 import sys
-import wave
+from collections import deque
 
 import numpy as np
 import requests
@@ -26,8 +27,25 @@ import sounddevice as sd
 
 
 def rms(audio_chunk: np.ndarray) -> float:
-    """Root mean square energy of an audio chunk."""
-    return float(np.sqrt(np.mean(audio_chunk.astype(np.float64) ** 2)))
+    """Root mean square energy of an int16 audio chunk.
+
+    Squares and sums in one BLAS float32 dot product: a 4-byte-per-sample
+    copy and no squared temporary, instead of a float64 copy and its square.
+    """
+    x = audio_chunk.reshape(-1).astype(np.float32)
+    return math.sqrt(float(np.dot(x, x)) / x.size)
+
+
+def spectral_centroid(audio_chunk: np.ndarray, window: np.ndarray, freqs: np.ndarray) -> float:
+    """Magnitude-weighted mean frequency (Hz) of the first channel of a chunk.
+
+    window and freqs are precomputed for the block size by the caller.
+    """
+    mag = np.abs(np.fft.rfft(audio_chunk[:, 0] * window))
+    total = mag.sum()
+    if total == 0:
+        return 0.0
+    return float(np.dot(freqs, mag) / total)
 
 
 def capture_utterance(
@@ -40,12 +58,17 @@ def capture_utterance(
     min_speech_duration: float = 0.3,
     max_speech_duration: float = 30.0,
     pre_speech_buffer_s: float = 0.3,
+    centroid_min_hz: float = 200.0,
+    centroid_max_hz: float = 3000.0,
 ) -> np.ndarray | None:
     """
     Capture a single utterance from the microphone.
 
     Waits for speech to start (energy above threshold), then records
     until silence is detected (energy below threshold for silence_duration seconds).
+    Recording only starts on a block whose spectral centroid also falls
+    within [centroid_min_hz, centroid_max_hz], so clicks and hums that
+    are loud but not speech-like don't trigger it.
 
     Returns the audio as a numpy array, or None if nothing was captured.
     """
@@ -54,10 +77,17 @@ def capture_utterance(
     min_speech_blocks = int(min_speech_duration * 1000 / block_duration_ms)
     max_blocks = int(max_speech_duration * 1000 / block_duration_ms)
     pre_buffer_blocks = int(pre_speech_buffer_s * 1000 / block_duration_ms)
+    window = np.hanning(block_size)
+    freqs = np.fft.rfftfreq(block_size, 1.0 / sample_rate)
 
     recording = False
-    audio_blocks: list[np.ndarray] = []
-    pre_buffer: list[np.ndarray] = []
+    # Whole utterance lands in one buffer sized for the worst case
+    # (pre-buffer + trigger block + max_blocks), so no concatenate at the end
+    audio = np.empty(((pre_buffer_blocks + 1 + max_blocks) * block_size, channels), dtype=np.int16)
+    write_pos = 0
+    # Rolling pre-buffer so we don't clip the start of speech; one extra
+    # slot holds the block that crosses the threshold
+    pre_buffer: deque[np.ndarray] = deque(maxlen=pre_buffer_blocks + 1)
     silent_count = 0
     speech_count = 0
 
@@ -72,27 +102,36 @@ def capture_utterance(
     ) as stream:
         while True:
             data, overflowed = stream.read(block_size)
-            energy = rms(data)
 
             if not recording:
-                # Keep a rolling pre-buffer so we don't clip the start of speech
-                pre_buffer.append(data.copy())
-                if len(pre_buffer) > pre_buffer_blocks:
-                    pre_buffer.pop(0)
-
-                if energy > speech_threshold:
+                # stream.read() returns a fresh array per call, so blocks
+                # are kept by reference; the deque drops the oldest itself
+                pre_buffer.append(data)
+
+                # RMS never exceeds the peak, so a quiet peak rules the
+                # block out without computing RMS (max/min, not abs(),
+                # since abs(-32768) overflows int16)
+                peak = max(int(data.max()), -int(data.min()))
+                if (
+                    peak > speech_threshold
+                    and rms(data) > speech_threshold
+                    and centroid_min_hz < spectral_centroid(data, window, freqs) < centroid_max_hz
+                ):
                     recording = True
                     silent_count = 0
                     speech_count = 1
-                    # Include pre-buffer to capture the very start of speech
-                    audio_blocks = list(pre_buffer)
-                    audio_blocks.append(data.copy())
+                    # Include pre-buffer (which already ends with this
+                    # block) to capture the very start of speech
+                    for block in pre_buffer:
+                        audio[write_pos:write_pos + len(block)] = block
+                        write_pos += len(block)
                     print("Speech detected, recording...", file=sys.stderr, flush=True)
             else:
-                audio_blocks.append(data.copy())
+                audio[write_pos:write_pos + len(data)] = data
+                write_pos += len(data)
                 speech_count += 1
 
-                if energy > speech_threshold:
+                if rms(data) > speech_threshold:
                     silent_count = 0
                 else:
                     silent_count += 1
@@ -107,25 +146,35 @@ def capture_utterance(
                     print("Max duration reached.", file=sys.stderr, flush=True)
                     break
 
-    if not audio_blocks:
+    if write_pos == 0:
         return None
 
-    return np.concatenate(audio_blocks)
+    return audio[:write_pos]
 
 
-def audio_to_wav_bytes(audio: np.ndarray, sample_rate: int = 16000) -> bytes:
-    """Convert numpy int16 audio to WAV bytes in memory."""
-    buf = io.BytesIO()
-    with wave.open(buf, "wb") as wf:
-        wf.setnchannels(1)
-        wf.setsampwidth(2)  # int16 = 2 bytes
-        wf.setframerate(sample_rate)
-        wf.writeframes(audio.tobytes())
-    return buf.getvalue()
+WAV_HEADER = struct.Struct("<4sI4s4sIHHIIHH4sI")
+
+
+def audio_to_wav_bytes(audio: np.ndarray, sample_rate: int = 16000) -> bytearray:
+    """Convert numpy int16 audio to mono WAV bytes in memory.
+
+    The header is packed by hand and the samples are copied once, straight
+    into the output buffer (no tobytes() + BytesIO + getvalue() copies).
+    """
+    data_len = audio.size * 2  # int16 = 2 bytes
+    buf = bytearray(WAV_HEADER.size + data_len)
+    WAV_HEADER.pack_into(
+        buf, 0,
+        b"RIFF", WAV_HEADER.size - 8 + data_len, b"WAVE",
+        b"fmt ", 16, 1, 1, sample_rate, sample_rate * 2, 2, 16,
+        b"data", data_len,
+    )
+    np.frombuffer(buf, dtype="<i2", offset=WAV_HEADER.size)[:] = audio.reshape(-1)
+    return buf
 
 
 def transcribe_with_server(
-    wav_bytes: bytes,
+    wav_bytes: bytes | bytearray,
     server_url: str = "http://localhost:8178",
 ) -> str:
     """Send WAV audio to whisper-cpp server and return transcription."""
@@ -148,7 +197,7 @@ def transcribe_with_server(
 
 
 def transcribe_with_cli(
-    wav_bytes: bytes,
+    wav_bytes: bytes | bytearray,
     model_path: str = "/tmp/ggml-small.en.bin",
 ) -> str:
     """Fallback: write WAV to temp file and use whisper-cpp CLI."""
@@ -198,6 +247,15 @@ def main():
             f.write("")
         sys.exit(0)
 
+    # Near-silence makes whisper hallucinate; skip transcription entirely
+    # max/min instead of abs(): no temporary, and no int16 overflow at -32768
+    max_amplitude = max(int(audio.max()), -int(audio.min()))
+    if max_amplitude < 650:  # ~0.02 * 32768
+        print(f"Low amplitude ({max_amplitude}/32768), likely silence. Skipping transcription.", file=sys.stderr)
+        with open(args.output, "w") as f:
+            f.write("")
+        sys.exit(0)
+
     # Convert to WAV
     wav_bytes = audio_to_wav_bytes(audio)
     duration = len(audio) / 16000
@@ -217,12 +275,6 @@ def main():
             print(f"CLI transcription also failed: {e2}", file=sys.stderr)
             sys.exit(1)
 
-    # Filter hallucinations on near-silence
-    max_amplitude = float(np.max(np.abs(audio)))
-    if max_amplitude < 650 and len(text) > 0:  # ~0.02 * 32768
-        print(f"Low amplitude ({max_amplitude:.0f}/32768), likely hallucination. Discarding.", file=sys.stderr)
-        text = ""
-
     # Write result
     with open(args.output, "w") as f:
         f.write(text)
@@ -14,23 +14,219 @@ the user speaks over TTS. Kills TTS and begins capture immediately.
 
 import argparse
 import asyncio
-import json
 import os
+import re
+import select
 import signal
 import sys
+import threading
 import time
 
 import numpy as np
 import sounddevice as sd
 
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+
+
+# Whisper hallucination tokens stripped from transcriptions
+HALLUCINATION_RE = re.compile(r"\[(?:Music|INAUDIBLE|BLANK_AUDIO)\]")
+
+# Max 100ms frames coalesced into a single websocket send
+SEND_BATCH_FRAMES = 4
+
+
+# PortAudio device list, queried once per process (slow on Core Audio)
+_DEVICE_CACHE = None
+
+
+def query_devices_cached():
+    """Return sd.query_devices(), querying PortAudio only on first use."""
+    global _DEVICE_CACHE
+    if _DEVICE_CACHE is None:
+        _DEVICE_CACHE = sd.query_devices()
+    return _DEVICE_CACHE
+
 
 def detect_blackhole_device() -> int | None:
     """Auto-detect BlackHole 2ch input device index."""
-    devices = sd.query_devices()
-    for i, dev in enumerate(devices):
-        if "BlackHole 2ch" in dev["name"] and dev["max_input_channels"] > 0:
-            return i
-    return None
+    return next(
+        (
+            i
+            for i, dev in enumerate(query_devices_cached())
+            if dev["max_input_channels"] > 0 and "BlackHole 2ch" in dev["name"]
+        ),
+        None,
+    )
+
+
+def frame_rms(frame: np.ndarray) -> float:
+    """RMS of an int16 frame. Squares and sums in one float32 dot product."""
+    x = frame.reshape(-1).astype(np.float32)
+    return float(np.sqrt(np.dot(x, x) / x.size))
+
+
+def sum_squares(frame: np.ndarray) -> int:
+    """Exact integer sum of squares of an int16 frame."""
+    x = frame.reshape(-1).astype(np.int64)
+    return int(np.dot(x, x))
+
+
+def geigel_hits(
+    mic_ss: np.ndarray,
+    ref_ss: np.ndarray,
+    ratio_sq: float,
+    ref_gate_ss: int,
+    mic_gate_ss: int,
+) -> np.ndarray:
+    """
+    Geigel double-talk decisions for a window of mic/reference frame pairs.
+
+    Takes per-frame sums of squares and compares in the squared domain
+    (RMS^2 * frame_size), so the whole window is scored in one vectorized
+    pass with no sqrt or division. Returns a bool array of speech hits.
+    """
+    # Geigel condition: mic echo is ~5-12% of BlackHole ref.
+    # User speech pushes mic to 50-100% of ref.
+    # Trigger when mic/ref ratio exceeds threshold (default 0.4).
+    # During a TTS pause (ref below gate), mic energy alone means speech.
+    return np.where(ref_ss > ref_gate_ss, mic_ss > ratio_sq * ref_ss, mic_ss > mic_gate_ss)
+
+
+async def wait_pid_exit(pid: int, poll_interval: float = 0.05):
+    """
+    Wait until process `pid` exits (it need not be our child).
+
+    Uses a pidfd on Linux or a kqueue NOTE_EXIT filter on macOS, registered
+    as a reader on the event loop, so exit is seen immediately without
+    polling. Falls back to polling os.kill(pid, 0) elsewhere.
+    """
+    loop = asyncio.get_running_loop()
+    exited = asyncio.Event()
+
+    if hasattr(os, "pidfd_open"):
+        try:
+            fd = os.pidfd_open(pid)
+        except ProcessLookupError:
+            return
+        loop.add_reader(fd, exited.set)
+        try:
+            await exited.wait()
+        finally:
+            loop.remove_reader(fd)
+            os.close(fd)
+        return
+
+    if hasattr(select, "kqueue"):
+        kq = select.kqueue()
+        try:
+            try:
+                kq.control(
+                    [
+                        select.kevent(
+                            pid,
+                            filter=select.KQ_FILTER_PROC,
+                            flags=select.KQ_EV_ADD | select.KQ_EV_ONESHOT,
+                            fflags=select.KQ_NOTE_EXIT,
+                        )
+                    ],
+                    0,
+                    0,
+                )
+            except ProcessLookupError:
+                return
+            loop.add_reader(kq.fileno(), exited.set)
+            try:
+                await exited.wait()
+            finally:
+                loop.remove_reader(kq.fileno())
+        finally:
+            kq.close()
+        return
+
+    while True:
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return
+        await asyncio.sleep(poll_interval)
+
+
+class FrameRing:
+    """
+    Preallocated single-producer/single-consumer ring of int16 frames.
+
+    The PortAudio callback thread copies each block into the next slot and
+    only wakes the event loop when the ring goes from empty to non-empty,
+    so there is no per-frame Future or call_soon_threadsafe. When full, the
+    oldest frame is overwritten. Frames returned to the consumer are views
+    into the ring and stay valid until the producer wraps around to them.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, frame_size: int, slots: int = 32):
+        self._loop = loop
+        self._buf = np.empty((slots, frame_size), dtype=np.int16)
+        self._slots = slots
+        self._head = 0  # next frame to read
+        self._tail = 0  # next frame to write
+        self._lock = threading.Lock()
+        self._ready = asyncio.Event()
+
+    def push(self, frame: np.ndarray):
+        """Producer side (callback thread): copy one frame into the ring."""
+        with self._lock:
+            was_empty = self._head == self._tail
+            np.copyto(self._buf[self._tail % self._slots], frame, casting="unsafe")
+            self._tail += 1
+            if self._tail - self._head > self._slots:
+                self._head = self._tail - self._slots
+        if was_empty:
+            self._loop.call_soon_threadsafe(self._ready.set)
+
+    def get_nowait(self) -> np.ndarray | None:
+        """Oldest unread frame, or None if the ring is empty."""
+        with self._lock:
+            if self._head == self._tail:
+                return None
+            frame = self._buf[self._head % self._slots]
+            self._head += 1
+            return frame
+
+    def latest(self) -> np.ndarray | None:
+        """Newest frame, discarding everything older. None if empty."""
+        with self._lock:
+            if self._head == self._tail:
+                return None
+            self._head = self._tail
+            return self._buf[(self._tail - 1) % self._slots]
+
+    def clear(self):
+        """Discard all unread frames."""
+        with self._lock:
+            self._head = self._tail
+
+    async def get(self) -> np.ndarray:
+        """Wait for and return the oldest unread frame."""
+        while True:
+            frame = self.get_nowait()
+            if frame is not None:
+                return frame
+            self._ready.clear()
+            # Re-check after clearing so a push in between is not missed
+            frame = self.get_nowait()
+            if frame is not None:
+                return frame
+            await self._ready.wait()
+
+    async def wait_ready(self):
+        """Wait until at least one frame is unread, without consuming it."""
+        while self._head == self._tail:
+            self._ready.clear()
+            if self._head != self._tail:
+                return
+            await self._ready.wait()
 
 
 async def capture_utterance(
@@ -102,18 +298,24 @@ async def capture_utterance(
             print("Listening for speech...", file=sys.stderr, flush=True)
 
         loop = asyncio.get_event_loop()
-        audio_queue: asyncio.Queue = asyncio.Queue()
-        ref_queue: asyncio.Queue = asyncio.Queue()
+        audio_ring = FrameRing(loop, frame_size)
+        ref_ring = FrameRing(loop, frame_size)
         done_event = asyncio.Event()
 
+        # Gain is applied in 8.8 fixed point on a reused int32 scratch buffer
+        # instead of a float64 round-trip per callback.
+        gain_q8 = int(round(gain * 256))
+        gain_scratch = np.empty(frame_size, dtype=np.int32)
+
         def audio_callback(indata, frames, time_info, status):
-            boosted = np.clip(
-                indata.astype(np.float64) * gain, -32768, 32767
-            ).astype(np.int16)
-            loop.call_soon_threadsafe(audio_queue.put_nowait, boosted)
+            buf = gain_scratch[:frames]
+            np.multiply(indata[:, 0], gain_q8, out=buf, dtype=np.int32)
+            buf >>= 8
+            np.clip(buf, -32768, 32767, out=buf)
+            audio_ring.push(buf)
 
         def ref_callback(indata, frames, time_info, status):
-            loop.call_soon_threadsafe(ref_queue.put_nowait, indata.copy())
+            ref_ring.push(indata[:, 0])
 
         # Mic stream
         mic_stream = sd.InputStream(
@@ -138,22 +340,17 @@ async def capture_utterance(
             )
 
         async def tts_monitor():
-            """Poll TTS process until it exits, then signal capture to begin."""
+            """Wait for the TTS process to exit, then signal capture to begin."""
             if not tts_active:
                 return
 
-            while not done_event.is_set():
-                try:
-                    os.kill(tts_pid, 0)
-                except ProcessLookupError:
-                    print(
-                        "TTS finished, capturing...",
-                        file=sys.stderr,
-                        flush=True,
-                    )
-                    tts_done_event.set()
-                    return
-                await asyncio.sleep(0.05)
+            await wait_pid_exit(tts_pid)
+            print(
+                "TTS finished, capturing...",
+                file=sys.stderr,
+                flush=True,
+            )
+            tts_done_event.set()
 
         async def barge_in_monitor():
             """Geigel DTD: detect user speech by comparing mic vs reference."""
@@ -170,41 +367,43 @@ async def capture_utterance(
 
             print("Barge-in monitor active.", file=sys.stderr, flush=True)
 
-            spike_count = 0
+            # Score the last 2N-1 frames together and trigger once N of them
+            # look like speech; a lone echo spike can't carry the window.
+            # Compare in the squared domain: mic_rms/ref_rms > R  <=>
+            # mic_ss > R^2 * ref_ss, so no per-frame sqrt or division.
+            window = 2 * barge_in_consecutive - 1
+            recent_mic_ss = np.zeros(window, dtype=np.int64)
+            recent_ref_ss = np.zeros(window, dtype=np.int64)
+            scored = 0
+            ratio_sq = barge_in_ratio * barge_in_ratio
+            ref_gate_ss = 50 * 50 * frame_size
+            mic_gate_ss = 500 * 500 * frame_size
 
             while not done_event.is_set() and not tts_done_event.is_set():
-                # Drain queues, keep latest frame from each
-                mic_frame = None
-                while not audio_queue.empty():
-                    mic_frame = audio_queue.get_nowait()
-
-                ref_frame = None
-                while not ref_queue.empty():
-                    ref_frame = ref_queue.get_nowait()
+                # Wake on the next mic block, then keep only the latest
+                # frame from each ring
+                await audio_ring.wait_ready()
+                if tts_done_event.is_set():
+                    break
+                mic_frame = audio_ring.latest()
+                ref_frame = ref_ring.latest()
 
                 if mic_frame is None or ref_frame is None:
-                    await asyncio.sleep(0.05)
                     continue
 
-                # Compute RMS power
-                mic_rms = float(np.sqrt(np.mean(mic_frame.astype(np.float64) ** 2)))
-                ref_rms = float(np.sqrt(np.mean(ref_frame.astype(np.float64) ** 2)))
-
-                # Geigel condition: mic echo is ~5-12% of BlackHole ref.
-                # User speech pushes mic to 50-100% of ref.
-                # Trigger when mic/ref ratio exceeds threshold (default 0.4).
-                # This catches user speech while ignoring echo-only frames.
-                ratio = mic_rms / max(ref_rms, 1)
-
-                if ref_rms > 50 and ratio > barge_in_ratio:
-                    spike_count += 1
-                elif ref_rms <= 50 and mic_rms > 500:
-                    # TTS pause but mic has energy = user speaking
-                    spike_count += 1
-                else:
-                    spike_count = max(0, spike_count - 1)
-
-                if spike_count >= barge_in_consecutive:
+                slot = scored % window
+                scored += 1
+                recent_mic_ss[slot] = sum_squares(mic_frame)
+                recent_ref_ss[slot] = sum_squares(ref_frame)
+                hits = np.count_nonzero(geigel_hits(
+                    recent_mic_ss, recent_ref_ss,
+                    ratio_sq, ref_gate_ss, mic_gate_ss,
+                ))
+
+                if hits >= barge_in_consecutive:
+                    mic_rms = frame_rms(mic_frame)
+                    ref_rms = frame_rms(ref_frame)
+                    ratio = mic_rms / max(ref_rms, 1)
                     print(
                         f"BARGE-IN! mic={mic_rms:.0f} ref={ref_rms:.0f} ratio={ratio:.2f}",
                         file=sys.stderr,
@@ -222,15 +421,11 @@ async def capture_utterance(
                     tts_done_event.set()
 
                     # Drain stale frames
-                    while not audio_queue.empty():
-                        audio_queue.get_nowait()
-                    while not ref_queue.empty():
-                        ref_queue.get_nowait()
+                    audio_ring.clear()
+                    ref_ring.clear()
 
                     return
 
-                await asyncio.sleep(0.05)
-
         async def send_audio():
             await tts_done_event.wait()
 
@@ -240,63 +435,65 @@ async def capture_utterance(
 
             # Drain echo frames accumulated during TTS
             if barge_in_enabled and not barge_in_triggered:
-                while not audio_queue.empty():
-                    audio_queue.get_nowait()
+                audio_ring.clear()
 
             # Open mic if not already open for barge-in
             if not barge_in_enabled:
                 mic_stream.start()
 
+            # No timeout needed: this task is cancelled once done_event is set,
+            # which wakes the pending get() immediately.
             try:
                 while not done_event.is_set():
-                    try:
-                        data = await asyncio.wait_for(
-                            audio_queue.get(), timeout=0.5
-                        )
-                        await ws.send(data.tobytes())
-                    except asyncio.TimeoutError:
-                        continue
+                    data = await audio_ring.get()
+                    # Coalesce frames that queued up meanwhile into one
+                    # message; never waits for more, so adds no latency.
+                    chunks = [data.tobytes()]
+                    while len(chunks) < SEND_BATCH_FRAMES:
+                        data = audio_ring.get_nowait()
+                        if data is None:
+                            break
+                        chunks.append(data.tobytes())
+                    await ws.send(b"".join(chunks))
             finally:
                 if not barge_in_enabled:
                     mic_stream.stop()
 
         async def recv_transcription():
             nonlocal text_result, last_text_change, got_text
-            idle_since = time.monotonic()
+            last_msg = None
 
             while not done_event.is_set():
                 try:
-                    msg = await asyncio.wait_for(ws.recv(), timeout=0.5)
-                    idle_since = time.monotonic()
+                    msg = await asyncio.wait_for(ws.recv(), timeout=30.0)
                 except asyncio.TimeoutError:
-                    if time.monotonic() - idle_since > 30.0:
-                        print("WLK server unresponsive for 30s, aborting.", file=sys.stderr, flush=True)
-                        done_event.set()
-                        return
-                    continue
+                    print("WLK server unresponsive for 30s, aborting.", file=sys.stderr, flush=True)
+                    done_event.set()
+                    return
                 except websockets.exceptions.ConnectionClosed as e:
                     print(f"WLK connection lost: {e}", file=sys.stderr, flush=True)
                     done_event.set()
                     return
 
-                d = json.loads(msg)
+                # WLK resends the full state; identical frames change nothing
+                if not isinstance(msg, str) or msg == last_msg:
+                    continue
+                last_msg = msg
+                # Status/config frames carry no transcript; don't decode them
+                if '"text"' not in msg and '"buffer_transcription"' not in msg:
+                    continue
+
+                d = json_loads(msg)
                 lines_text = " ".join(
-                    l.get("text", "") for l in d.get("lines", [])
+                    [l["text"] for l in d.get("lines") or () if l.get("text")]
                 ).strip()
                 buffer_text = d.get("buffer_transcription", "").strip()
                 combined = (lines_text + " " + buffer_text).strip()
 
-                # Filter whisper hallucinations
-                if any(
-                    h in combined
-                    for h in ["[Music]", "[INAUDIBLE]", "[BLANK_AUDIO]"]
-                ):
-                    combined = (
-                        combined.replace("[Music]", "")
-                        .replace("[INAUDIBLE]", "")
-                        .replace("[BLANK_AUDIO]", "")
-                        .strip()
-                    )
+                # Filter whisper hallucinations; every marker
+                # starts with "[", so clean text skips the regex engine
+                if "[" in combined:
+                    combined = HALLUCINATION_RE.sub("", combined).strip()
 
                 if combined and combined != text_result:
                     text_result = combined
@@ -344,6 +541,11 @@ async def capture_utterance(
             mic_stream.start()
             ref_stream.start()
 
+        # SIGTERM/SIGINT end the capture the same way end-of-utterance does,
+        # so streams are closed and the partial transcription is still written
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(sig, done_event.set)
+
         try:
             tasks = [
                 asyncio.create_task(tts_monitor()),
@@ -359,6 +561,8 @@ async def capture_utterance(
                 t.cancel()
             await asyncio.gather(*tasks, return_exceptions=True)
         finally:
+            for sig in (signal.SIGTERM, signal.SIGINT):
+                loop.remove_signal_handler(sig)
             if barge_in_enabled:
                 mic_stream.stop()
                 mic_stream.close()
@@ -417,7 +621,7 @@ def main():
         "--barge-in-consecutive",
         type=int,
         default=3,
-        help="Consecutive spike frames needed to trigger barge-in",
+        help="Speech frames needed within the last 2N-1 frames to trigger barge-in",
     )
     args = parser.parse_args()
 
@@ -442,6 +646,12 @@ def main():
 
     os.makedirs(os.path.dirname(args.output), exist_ok=True)
 
+    try:
+        import uvloop
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    except ImportError:
+        pass
+
     text = asyncio.run(
         capture_utterance(
             server_url=args.server,
@@ -22,11 +22,15 @@ API:
 import asyncio
 import json
 import logging
+import math
 import os
+import re
 import signal
-import subprocess
 import sys
+import threading
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import asynccontextmanager
 from datetime import datetime
 from pathlib import Path
@@ -39,6 +43,21 @@ import websockets
 from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel
 
+try:
+    import orjson
+
+    json_loads = orjson.loads
+
+    def json_line(obj: Any) -> bytes:
+        """Serialize obj as one newline-terminated JSON line"""
+        return orjson.dumps(obj, option=orjson.OPT_APPEND_NEWLINE)
+except ImportError:
+    json_loads = json.loads
+
+    def json_line(obj: Any) -> bytes:
+        """Serialize obj as one newline-terminated JSON line"""
+        return (json.dumps(obj) + "\n").encode()
+
 
 # ============================================================================
 # Speex Acoustic Echo Cancellation
@@ -64,18 +83,20 @@ class SpeexAEC:
         if self._lib is None:
             raise RuntimeError("libspeexdsp not found. Install with: brew install speexdsp")
 
-        self._ctypes = ctypes
         self._frame_size = frame_size
+        # Output buffer reused by every cancel() call, with its address cached
+        self._out = np.zeros(frame_size, dtype=np.int16)
+        self._out_ptr = self._out.ctypes.data
 
-        # Bind functions
+        # Bind functions (buffers are passed as raw addresses of int16 data)
         self._lib.speex_echo_state_init.restype = ctypes.c_void_p
         self._lib.speex_echo_state_init.argtypes = [ctypes.c_int, ctypes.c_int]
         self._lib.speex_echo_cancellation.restype = None
         self._lib.speex_echo_cancellation.argtypes = [
             ctypes.c_void_p,
-            ctypes.POINTER(ctypes.c_int16),
-            ctypes.POINTER(ctypes.c_int16),
-            ctypes.POINTER(ctypes.c_int16),
+            ctypes.c_void_p,
+            ctypes.c_void_p,
+            ctypes.c_void_p,
         ]
         self._lib.speex_echo_ctl.restype = ctypes.c_int
         self._lib.speex_echo_ctl.argtypes = [ctypes.c_void_p, ctypes.c_int, ctypes.c_void_p]
@@ -88,16 +109,14 @@ class SpeexAEC:
         self._lib.speex_echo_ctl(self._state, SPEEX_ECHO_SET_SAMPLING_RATE, ctypes.byref(rate))
 
     def cancel(self, mic: np.ndarray, ref: np.ndarray) -> np.ndarray:
-        """Process one frame: subtract echo of ref from mic, return cleaned audio."""
-        ct = self._ctypes
-        out = np.zeros(self._frame_size, dtype=np.int16)
-        self._lib.speex_echo_cancellation(
-            self._state,
-            mic.ctypes.data_as(ct.POINTER(ct.c_int16)),
-            ref.ctypes.data_as(ct.POINTER(ct.c_int16)),
-            out.ctypes.data_as(ct.POINTER(ct.c_int16)),
-        )
-        return out
+        """Process one frame: subtract echo of ref from mic, return cleaned audio.
+
+        mic and ref must be C-contiguous int16 frames of frame_size samples.
+        The returned array is an internal buffer overwritten by the next call;
+        copy it to keep it.
+        """
+        self._lib.speex_echo_cancellation(self._state, mic.ctypes.data, ref.ctypes.data, self._out_ptr)
+        return self._out
 
     def destroy(self):
         if self._state:
@@ -114,26 +133,74 @@ class SpeexAEC:
 
 
 class EventLogger:
-    """Logs timestamped events to file for latency analysis"""
+    """Logs timestamped events to file for latency analysis.
+
+    log_event only timestamps and queues the entry; a background writer task
+    (see start()) formats and appends everything pending in one os.write.
+    This batches writes and takes formatting out of the handlers, but the
+    write itself still runs on the event-loop thread (an O_APPEND write to
+    the page cache, normally microseconds). Before start() or after close(),
+    entries are written synchronously.
+    """
 
     def __init__(self, log_file: Path):
         self.log_file = log_file
         self.log_file.parent.mkdir(parents=True, exist_ok=True)
         # Append mode, create if doesn't exist
-        self.file = open(self.log_file, "a", buffering=1)  # Line buffered
+        self._fd = os.open(self.log_file, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        self._pending: list[tuple[str, str, dict[str, Any] | None]] = []
+        self._wakeup = asyncio.Event()
+        self._writer: asyncio.Task | None = None
         self.log_event("SERVER_START", {"pid": os.getpid()})
 
+    def start(self):
+        """Start the background writer (requires a running event loop)"""
+        self._writer = asyncio.create_task(self._run_writer())
+
+    async def _run_writer(self):
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            # Report and carry on: a dead writer task would leave _pending
+            # growing forever with nothing logged
+            try:
+                self._flush()
+            except OSError as e:
+                print(f"[EventLogger] write failed, dropped batch: {e}", file=sys.stderr, flush=True)
+
+    def _flush(self):
+        """Format and append all pending entries in a single write"""
+        if not self._pending:
+            return
+        # Take the batch first so a failed write drops it instead of
+        # retrying it forever
+        pending, self._pending = self._pending, []
+        lines = []
+        for timestamp, event, data in pending:
+            entry = {"timestamp": timestamp, "event": event}
+            if data:
+                entry.update(data)
+            try:
+                lines.append(json_line(entry))
+            except (TypeError, ValueError) as e:  # orjson.JSONEncodeError is a TypeError
+                print(f"[EventLogger] unserializable {event} entry dropped: {e}", file=sys.stderr, flush=True)
+        if lines:
+            os.write(self._fd, b"".join(lines))
+
     def log_event(self, event: str, data: dict[str, Any] | None = None):
-        """Write event with timestamp to log file"""
-        timestamp = datetime.now().isoformat()
-        entry = {"timestamp": timestamp, "event": event}
-        if data:
-            entry.update(data)
-        self.file.write(json.dumps(entry) + "\n")
+        """Queue event with timestamp for the log file"""
+        self._pending.append((datetime.now().isoformat(), event, data))
+        if self._writer is None:
+            self._flush()
+        else:
+            self._wakeup.set()
 
     def close(self):
+        if self._writer is not None:
+            self._writer.cancel()
+            self._writer = None
         self.log_event("SERVER_STOP")
-        self.file.close()
+        os.close(self._fd)
 
 
 # ============================================================================
@@ -141,6 +208,9 @@ class EventLogger:
 # ============================================================================
 
 
+ENV_VAR_RE = re.compile(r"\$\{(\w+)\}|\$(\w+)")
+
+
 class Config:
     """Loads config from defaults.env + ~/.claude-talk/config.env"""
 
@@ -151,6 +221,20 @@ class Config:
         if user_config.exists():
             self._load_env_file(user_config)
 
+        # Typed settings, parsed once so callers never re-convert strings
+        self.audio_device = self.get("AUDIO_DEVICE", "auto")
+        self.mic_gain = self.get_float("MIC_GAIN", 8.0)
+        self.silence_secs = self.get_float("SILENCE_SECS", 2.0)
+        self.barge_in = self.get_bool("BARGE_IN", True)
+        self.blackhole_device = self.get("BLACKHOLE_DEVICE", "")
+        self.barge_in_ratio = self.get_float("BARGE_IN_RATIO", 0.4)
+        self.voice = self.get("VOICE", "Daniel")
+        self.wlk_port = self.get_int("WLK_PORT", 8090)
+        self.wlk_url = self.get("WLK_URL", "ws://localhost:8090/asr")
+        self.wlk_send_chunk_ms = self.get_int("WLK_SEND_CHUNK_MS", 200)
+        self.wlk_venv = Path(self.get("WLK_VENV"))
+        self.audio_server_port = self.get_int("AUDIO_SERVER_PORT", 8150)
+
     def _load_env_file(self, path: Path):
         """Parse shell-style KEY=VALUE lines"""
         if not path.exists():
@@ -164,18 +248,15 @@ class Config:
             key, _, val = line.partition("=")
             # Remove quotes
             val = val.strip().strip('"').strip("'")
-            self.values[key.strip()] = val
-
-        # Second pass: expand variables now that all are loaded
-        for key in list(self.values.keys()):
-            original = self.values[key]
-            # Expand $HOME and ${VAR} using both os.environ and self.values
-            expanded = original
-            for var_key, var_val in self.values.items():
-                expanded = expanded.replace(f"${{{var_key}}}", var_val)
-                expanded = expanded.replace(f"${var_key}", var_val)
-            expanded = os.path.expandvars(expanded)
-            self.values[key] = expanded
+            # Expand $VAR / ${VAR} against keys loaded so far, then os.environ
+            # (same order as `source`-ing the file in a shell)
+            self.values[key.strip()] = ENV_VAR_RE.sub(self._expand_var, val)
+
+    def _expand_var(self, match: re.Match) -> str:
+        name = match.group(1) or match.group(2)
+        if name in self.values:
+            return self.values[name]
+        return os.environ.get(name, match.group(0))
 
     def get(self, key: str, default: str = "") -> str:
         return self.values.get(key, default)
@@ -209,10 +290,16 @@ class Config:
 class StateManager:
     """Manages ~/.claude-talk/state file (single writer, no locking needed)"""
 
+    SAVE_DEBOUNCE_SECS = 0.1
+
     def __init__(self):
         self.state_file = Path.home() / ".claude-talk/state"
         self.state_file.parent.mkdir(parents=True, exist_ok=True)
         self.state: dict[str, str] = {}
+        # MUTED parsed once per change, not on every speak/listen
+        self.muted = False
+        # Pending debounced write, if any (see set())
+        self._save_handle: asyncio.TimerHandle | None = None
         self._load()
 
     def _load(self):
@@ -224,16 +311,50 @@ class StateManager:
             if "=" in line:
                 key, _, val = line.partition("=")
                 self.state[key.strip()] = val.strip()
+        self.muted = self.state.get("MUTED", "false").lower() == "true"
 
     def _save(self):
         """Write state to file atomically"""
+        # Temp file + rename, not an in-place rewrite of a kept-open fd: shell
+        # readers must never see a truncated file, and scripts/state.sh also
+        # replaces the file by rename, which would orphan a long-lived fd.
         tmp = self.state_file.with_suffix(".tmp")
-        tmp.write_text("\n".join(f"{k}={v}" for k, v in self.state.items()) + "\n")
-        tmp.replace(self.state_file)
+        data = "".join(f"{k}={v}\n" for k, v in self.state.items()).encode()
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            os.write(fd, data)
+        finally:
+            os.close(fd)
+        os.replace(tmp, self.state_file)
 
     def set(self, **kwargs: str):
-        """Update state values and write to disk"""
+        """
+        Update state values and schedule a write if anything changed.
+
+        Writes are debounced by SAVE_DEBOUNCE_SECS so back-to-back status
+        transitions (e.g. speaking -> speaking+listening) cost one rename.
+        Outside a running event loop the write happens immediately.
+        """
+        if all(self.state.get(k) == v for k, v in kwargs.items()):
+            return
         self.state.update(kwargs)
+        if "MUTED" in kwargs:
+            self.muted = kwargs["MUTED"].lower() == "true"
+        if self._save_handle is not None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._save()
+            return
+        self._save_handle = loop.call_later(self.SAVE_DEBOUNCE_SECS, self.flush)
+
+    def flush(self):
+        """Write any pending state change to disk now"""
+        if self._save_handle is None:
+            return
+        self._save_handle.cancel()
+        self._save_handle = None
         self._save()
 
     def get(self, key: str, default: str = "") -> str:
@@ -250,10 +371,27 @@ class WLKManager:
 
     def __init__(self, config: Config):
         self.config = config
-        self.port = config.get_int("WLK_PORT", 8090)
-        self.venv_path = Path(config.get("WLK_VENV"))
-        self.process: subprocess.Popen | None = None
+        self.port = config.wlk_port
+        self.venv_path = config.wlk_venv
+        self.process: asyncio.subprocess.Process | None = None
         self.stop_requested = False
+        # Command line is fixed across restarts; build it once
+        self._wlk_cmd = (
+            str(self.venv_path / "bin/wlk"),
+            "--model",
+            "small.en",
+            "--language",
+            "en",
+            "--backend",
+            "mlx-whisper",
+            "--port",
+            str(self.port),
+            "--pcm-input",
+        )
+        # Set once WLK accepts connections; cleared while it (re)starts
+        self.ready_event = asyncio.Event()
+        # Last stderr lines of the current WLK process, for crash diagnostics
+        self._stderr_tail: deque[str] = deque(maxlen=200)
 
     async def start(self):
         """Start WLK in background with auto-restart loop"""
@@ -264,6 +402,7 @@ class WLKManager:
         # Check if already running
         if await self._is_running():
             print(f"WLK already running on port {self.port}")
+            self.ready_event.set()
             return
 
         # Run in background task
@@ -271,48 +410,38 @@ class WLKManager:
 
     async def _run_wlk(self):
         """Auto-restart loop for WLK"""
-        wlk_bin = self.venv_path / "bin/wlk"
         while not self.stop_requested:
             print(f"[WLK] starting on port {self.port}...", file=sys.stderr, flush=True)
-            self.process = subprocess.Popen(
-                [
-                    str(wlk_bin),
-                    "--model",
-                    "small.en",
-                    "--language",
-                    "en",
-                    "--backend",
-                    "mlx-whisper",
-                    "--port",
-                    str(self.port),
-                    "--pcm-input",
-                ],
-                stdout=subprocess.DEVNULL,
-                stderr=subprocess.PIPE,
+            self.ready_event.clear()
+            # Own session: a terminal Ctrl-C reaches only the server, which
+            # then stops WLK itself via stop() in the lifespan shutdown
+            self.process = await asyncio.create_subprocess_exec(
+                *self._wlk_cmd,
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.PIPE,
+                start_new_session=True,
             )
+            self._stderr_tail.clear()
+            stderr_task = asyncio.create_task(self._tail_stderr(self.process))
+            asyncio.create_task(self._probe_ready(self.process))
 
-            # Wait for process to exit
-            while self.process and self.process.poll() is None:
-                await asyncio.sleep(0.5)
-                if self.stop_requested:
-                    self.process.terminate()
-                    await asyncio.sleep(1)
-                    if self.process.poll() is None:
-                        self.process.kill()
-                    return
+            # Wait for process to exit; stop() terminates it, which wakes us
+            exit_code = await self.process.wait()
+            self.ready_event.clear()
+            if self.stop_requested:
+                return
 
-            # Drain stderr for crash diagnostics
-            exit_code = self.process.returncode if self.process else None
+            # Let the tail reader hit EOF, then dump it for crash diagnostics
             print(f"[WLK] process exited with code {exit_code} at {time.strftime('%Y-%m-%d %H:%M:%S')}", file=sys.stderr, flush=True)
-            if self.process and self.process.stderr:
-                try:
-                    err = self.process.stderr.read().decode(errors="replace")
-                    if err.strip():
-                        print(f"[WLK] stderr output (last 20 lines):", file=sys.stderr, flush=True)
-                        for line in err.strip().splitlines()[-20:]:
-                            print(f"[WLK]   {line}", file=sys.stderr, flush=True)
-                except Exception as e:
-                    print(f"[WLK] failed to read stderr: {e}", file=sys.stderr, flush=True)
+            try:
+                await asyncio.wait_for(stderr_task, timeout=1.0)
+            except asyncio.TimeoutError:
+                pass
+            lines = [line for line in self._stderr_tail if line.strip()]
+            if lines:
+                print(f"[WLK] stderr output (last 20 lines):", file=sys.stderr, flush=True)
+                for line in lines[-20:]:
+                    print(f"[WLK]   {line}", file=sys.stderr, flush=True)
 
             if self.stop_requested:
                 return
@@ -320,6 +449,54 @@ class WLKManager:
             print(f"[WLK] restarting in 2s...", file=sys.stderr, flush=True)
             await asyncio.sleep(2)
 
+    async def _tail_stderr(self, process: asyncio.subprocess.Process):
+        """
+        Read WLK's stderr as it is written: keeps the pipe from filling up
+        and blocking WLK, retains a bounded tail, and sets ready_event as
+        soon as uvicorn's startup banner appears.
+        """
+        while True:
+            try:
+                raw = await process.stderr.readline()
+            except ValueError:
+                continue  # over-long line; readline already discarded it
+            if not raw:
+                return
+            line = raw.decode(errors="replace").rstrip()
+            self._stderr_tail.append(line)
+            if not self.ready_event.is_set() and "Uvicorn running on" in line:
+                self.ready_event.set()
+
+    async def _probe_ready(self, process: asyncio.subprocess.Process):
+        """Fallback to the stderr banner: set ready_event once WLK accepts connections"""
+        while process.returncode is None and not self.stop_requested and not self.ready_event.is_set():
+            if await self._is_running():
+                self.ready_event.set()
+                return
+            await asyncio.sleep(0.05)
+
+    async def ensure_ready(self, timeout: float = 10.0) -> bool:
+        """
+        Return True once WLK accepts connections, False after `timeout`.
+
+        ready_event is trusted while set (it is cleared when WLK exits), so
+        the steady state costs no probe. Otherwise probe with exponential
+        backoff, returning on the first success.
+        """
+        if self.ready_event.is_set():
+            return True
+        deadline = time.monotonic() + timeout
+        delay = 0.05
+        while True:
+            if await self._is_running():
+                self.ready_event.set()
+                return True
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            await asyncio.sleep(min(delay, remaining))
+            delay = min(delay * 2, 1.6)
+
     async def _is_running(self) -> bool:
         """Check if WLK is responding on its port"""
         try:
@@ -333,13 +510,24 @@ class WLKManager:
             return False
 
     async def stop(self):
-        """Stop WLK subprocess"""
+        """
+        Stop WLK subprocess. WLK runs in its own session (and so its own
+        process group, pgid == pid), so signal the whole group to take any
+        workers it forked down with it.
+        """
         self.stop_requested = True
-        if self.process and self.process.poll() is None:
-            self.process.terminate()
-            await asyncio.sleep(1)
-            if self.process.poll() is None:
-                self.process.kill()
+        if self.process and self.process.returncode is None:
+            pgid = self.process.pid
+            try:
+                os.killpg(pgid, signal.SIGTERM)
+                await asyncio.wait_for(self.process.wait(), timeout=1.0)
+            except ProcessLookupError:
+                pass
+            except asyncio.TimeoutError:
+                try:
+                    os.killpg(pgid, signal.SIGKILL)
+                except ProcessLookupError:
+                    pass
 
 
 # ============================================================================
@@ -347,74 +535,214 @@ class WLKManager:
 # ============================================================================
 
 
+# PortAudio enumerates devices once at initialization, so the list can't
+# change for the life of the process; query it once (slow on Core Audio)
+_DEVICE_CACHE = None
+
+
+def query_devices_cached():
+    """Return sd.query_devices(), querying PortAudio only on first use."""
+    global _DEVICE_CACHE
+    if _DEVICE_CACHE is None:
+        _DEVICE_CACHE = sd.query_devices()
+    return _DEVICE_CACHE
+
+
+_DEVICE_LIST_CACHE = None
+
+
+def device_list_cached() -> list[dict]:
+    """Return the /devices entries, built once from the cached device list."""
+    global _DEVICE_LIST_CACHE
+    if _DEVICE_LIST_CACHE is None:
+        _DEVICE_LIST_CACHE = [
+            {
+                "index": i,
+                "name": dev["name"],
+                "input_channels": dev["max_input_channels"],
+                "output_channels": dev["max_output_channels"],
+            }
+            for i, dev in enumerate(query_devices_cached())
+        ]
+    return _DEVICE_LIST_CACHE
+
+
 def detect_blackhole_device() -> int | None:
     """Auto-detect BlackHole 2ch input device index."""
-    devices = sd.query_devices()
-    for i, dev in enumerate(devices):
-        if "BlackHole 2ch" in dev["name"] and dev["max_input_channels"] > 0:
-            return i
-    return None
+    return next(
+        (
+            i
+            for i, dev in enumerate(query_devices_cached())
+            if dev["max_input_channels"] > 0 and "BlackHole 2ch" in dev["name"]
+        ),
+        None,
+    )
+
+
+class FrameRing:
+    """
+    Preallocated single-producer/single-consumer ring of int16 frames.
+
+    The PortAudio callback thread copies each block into the next slot and
+    only wakes the event loop when the ring goes from empty to non-empty,
+    so there is no per-frame Future or call_soon_threadsafe. When full, the
+    oldest frame is overwritten. Frames returned to the consumer are views
+    into the ring and stay valid until the producer wraps around to them.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, frame_size: int, slots: int = 32):
+        self._loop = loop
+        self._buf = np.empty((slots, frame_size), dtype=np.int16)
+        self._slots = slots
+        self._head = 0  # next frame to read
+        self._tail = 0  # next frame to write
+        self._lock = threading.Lock()
+        self._ready = asyncio.Event()
+
+    def push(self, frame: np.ndarray):
+        """Producer side (callback thread): copy one frame into the ring."""
+        with self._lock:
+            was_empty = self._head == self._tail
+            np.copyto(self._buf[self._tail % self._slots], frame, casting="unsafe")
+            self._tail += 1
+            if self._tail - self._head > self._slots:
+                self._head = self._tail - self._slots
+        if was_empty:
+            self._loop.call_soon_threadsafe(self._ready.set)
+
+    def get_nowait(self) -> np.ndarray | None:
+        """Oldest unread frame, or None if the ring is empty."""
+        with self._lock:
+            if self._head == self._tail:
+                return None
+            frame = self._buf[self._head % self._slots]
+            self._head += 1
+            return frame
+
+    def latest(self) -> np.ndarray | None:
+        """Newest frame, discarding everything older. None if empty."""
+        with self._lock:
+            if self._head == self._tail:
+                return None
+            self._head = self._tail
+            return self._buf[(self._tail - 1) % self._slots]
+
+    def clear(self):
+        """Discard all unread frames."""
+        with self._lock:
+            self._head = self._tail
+
+    async def get(self) -> np.ndarray:
+        """Wait for and return the oldest unread frame."""
+        while True:
+            frame = self.get_nowait()
+            if frame is not None:
+                return frame
+            self._ready.clear()
+            # Re-check after clearing so a push in between is not missed
+            frame = self.get_nowait()
+            if frame is not None:
+                return frame
+            await self._ready.wait()
+
+    async def wait_ready(self):
+        """Wait until at least one frame is unread, without consuming it."""
+        while self._head == self._tail:
+            self._ready.clear()
+            if self._head != self._tail:
+                return
+            await self._ready.wait()
+
+
+def sum_squares(frame: np.ndarray) -> float:
+    """Sum of squares of a 1-D int16 frame, as one float32 BLAS dot product
+    (4 bytes per sample copied; relative error ~1e-7, far below any threshold)."""
+    x = frame.astype(np.float32)
+    return float(np.dot(x, x))
 
 
 def auto_detect_input_device() -> int:
     """Use the macOS system default input device (set in System Settings > Sound)."""
     default_input = sd.default.device[0]
     if default_input is not None and default_input >= 0:
-        dev = sd.query_devices(int(default_input))
+        dev = query_devices_cached()[int(default_input)]
         print(f"  System default input: [{int(default_input)}] {dev['name']}")
         return int(default_input)
     raise RuntimeError("No default input audio device configured in System Settings")
 
 
+# Punctuation ignored when comparing transcription words against TTS text
+ECHO_PUNCT_TABLE = str.maketrans("", "", ".,!?;:-—'\"")
+
+# Whisper hallucination markers (exact and truncated, e.g. "[BLANK_AUD")
+HALLUCINATION_RE = re.compile(r"\[(?:Music|INAUDIBLE|BLANK_AUDIO|BLANK[^\]]*)\]?", re.IGNORECASE)
+
+
 class AudioEngine:
     """Handles mic capture, TTS, barge-in, and WLK transcription"""
 
-    def __init__(self, config: Config, state: StateManager, event_logger: EventLogger):
+    def __init__(self, config: Config, state: StateManager, event_logger: EventLogger, wlk_manager: WLKManager):
         self.config = config
         self.state = state
         self.logger = event_logger
+        self.wlk_manager = wlk_manager
 
         # Audio settings — auto-detect unless explicitly configured
-        device_cfg = config.get("AUDIO_DEVICE", "auto")
+        device_cfg = config.audio_device
         self._auto_device = device_cfg.lower() == "auto" or device_cfg == ""
         if self._auto_device:
             self.device_index = auto_detect_input_device()
         else:
             self.device_index = int(device_cfg)
-            print(f"  Using configured mic device: [{self.device_index}] {sd.query_devices(self.device_index)['name']}")
+            print(f"  Using configured mic device: [{self.device_index}] {query_devices_cached()[self.device_index]['name']}")
         self.sample_rate = 16000
-        self.gain = config.get_float("MIC_GAIN", 8.0)
-        self.silence_timeout = config.get_float("SILENCE_SECS", 2.0)
+        # PortAudio delivers 20ms blocks; barge-in scores 100ms windows of them
+        self.block_size = int(self.sample_rate * 0.02)
+        self.blocks_per_window = 5
+        self.gain = config.mic_gain
+        self.silence_timeout = config.silence_secs
         self.max_duration = 60.0
 
         # Barge-in settings
-        self.barge_in_enabled = config.get_bool("BARGE_IN", True)
-        blackhole_cfg = config.get("BLACKHOLE_DEVICE", "")
+        self.barge_in_enabled = config.barge_in
+        blackhole_cfg = config.blackhole_device
         if blackhole_cfg:
             self.blackhole_device = int(blackhole_cfg)
         else:
             self.blackhole_device = detect_blackhole_device()
         if self.blackhole_device is None:
             self.barge_in_enabled = False
-        self.barge_in_ratio = config.get_float("BARGE_IN_RATIO", 0.4)
+        self.barge_in_ratio = config.barge_in_ratio
 
         # TTS settings
-        self.voice = config.get("VOICE", "Daniel")
+        self.voice = config.voice
 
         # WLK settings
-        self.wlk_url = config.get("WLK_URL", "ws://localhost:8090/asr")
+        self.wlk_url = config.wlk_url
+        # Mic audio is sent to WLK in messages of this many bytes (int16 mono)
+        self.send_chunk_bytes = max(1, self.sample_rate * config.wlk_send_chunk_ms // 1000) * 2
 
-        # Persistent resources
+        # Persistent resources: input streams are opened on first capture and
+        # kept running; callbacks push frames into the FrameRing of the
+        # capture in progress, if any
         self.mic_stream: sd.InputStream | None = None
         self.ref_stream: sd.InputStream | None = None
+        self._gain_q8 = int(round(self.gain * 256))
+        self._gain_scratch = np.empty(self.block_size, dtype=np.int32)
+        self._mic_target: FrameRing | None = None
+        self._ref_target: FrameRing | None = None
         self.lock = asyncio.Lock()  # Serialize capture operations
+        # Set on SIGINT/SIGTERM so a capture in flight ends right away
+        self.shutdown_event = asyncio.Event()
 
-        # Acoustic Echo Cancellation (Speex)
+        # Acoustic Echo Cancellation (Speex), run on its own worker thread
         self.aec = None
+        self._aec_executor: ThreadPoolExecutor | None = None
         if self.barge_in_enabled and self.blackhole_device is not None:
             try:
-                self.aec = SpeexAEC(frame_size=1600, filter_length=4800, sample_rate=16000)
-                print(f"  Speex AEC: enabled (frame=1600, filter=4800)")
+                self.aec = SpeexAEC(frame_size=self.block_size, filter_length=4800, sample_rate=16000)
+                self._aec_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="aec")
+                print(f"  Speex AEC: enabled (frame={self.block_size}, filter=4800)")
             except Exception as e:
                 print(f"  Speex AEC: unavailable ({e})", file=sys.stderr)
 
@@ -422,6 +750,12 @@ class AudioEngine:
         self._buffered_text: str | None = None
         self._buffer_task: asyncio.Task | None = None
 
+        # Pre-opened WLK websocket for the next capture. Each utterance still
+        # gets its own WLK session (WLK accumulates transcript lines per
+        # connection), but the handshake happens off the critical path.
+        self._spare_ws_task: asyncio.Task | None = None
+        self._spare_ws_closed = False  # set at shutdown: no more pre-opening
+
         print(f"AudioEngine initialized:")
         print(f"  Mic device: {self.device_index}, gain: {self.gain}")
         print(f"  TTS voice: {self.voice}")
@@ -431,12 +765,134 @@ class AudioEngine:
         else:
             print(" (disabled)")
 
+    def _mic_callback(self, indata, frames, time_info, status):
+        ring = self._mic_target
+        if ring is None:
+            return
+        # Gain in 8.8 fixed point, in place on a reused int32 scratch buffer
+        buf = self._gain_scratch[:frames]
+        np.multiply(indata[:, 0], self._gain_q8, out=buf, dtype=np.int32)
+        buf >>= 8
+        np.clip(buf, -32768, 32767, out=buf)
+        ring.push(buf)
+
+    def _ref_callback(self, indata, frames, time_info, status):
+        ring = self._ref_target
+        if ring is not None:
+            ring.push(indata[:, 0])
+
+    @staticmethod
+    def _stream_usable(stream: sd.InputStream | None) -> bool:
+        # PortAudio stops a stream for good on device loss, a Core Audio
+        # reset or a callback error; its callback never fires again
+        return stream is not None and not stream.closed and stream.active
+
+    def _open_streams(self, with_ref: bool):
+        """
+        Open the persistent input streams, reopening either one if PortAudio
+        has stopped it.
+        """
+        if not self._stream_usable(self.mic_stream):
+            if self.mic_stream is not None:
+                self.mic_stream.close(ignore_errors=True)
+                self.mic_stream = None
+            self.mic_stream = sd.InputStream(
+                device=self.device_index,
+                samplerate=self.sample_rate,
+                channels=1,
+                dtype="int16",
+                blocksize=self.block_size,
+                callback=self._mic_callback,
+            )
+            self.mic_stream.start()
+
+        # Reference stream (BlackHole) - only once barge-in is first needed
+        if with_ref and not self._stream_usable(self.ref_stream):
+            if self.ref_stream is not None:
+                self.ref_stream.close(ignore_errors=True)
+                self.ref_stream = None
+            self.ref_stream = sd.InputStream(
+                device=self.blackhole_device,
+                samplerate=self.sample_rate,
+                channels=1,
+                dtype="int16",
+                blocksize=self.block_size,
+                callback=self._ref_callback,
+            )
+            self.ref_stream.start()
+
+    def close_streams(self):
+        """Stop and close the persistent input streams"""
+        self._mic_target = None
+        self._ref_target = None
+        for stream in (self.mic_stream, self.ref_stream):
+            if stream is not None:
+                stream.stop()
+                stream.close()
+        self.mic_stream = None
+        self.ref_stream = None
+
+    async def _connect_wlk(self):
+        # The spare connection can sit idle for minutes between turns; the
+        # websockets default keepalive (20s ping, 20s pong timeout) shows a
+        # dead one as closed before _take_ws(). The timeout is not tightened:
+        # the spare becomes the live capture socket, and a WLK stall of a few
+        # seconds (warm-up, long inference) must not drop the utterance
+        return await asyncio.wait_for(
+            websockets.connect(self.wlk_url, compression=None),
+            timeout=10.0,
+        )
+
+    def _prewarm_ws(self):
+        """Start opening the next capture's WLK websocket in the background"""
+        # A capture ending because of shutdown must not open a socket that
+        # close_spare_ws() has already run past (or WLK is being stopped)
+        if self._spare_ws_closed or self.shutdown_event.is_set():
+            return
+        if self._spare_ws_task is None:
+            self._spare_ws_task = asyncio.create_task(self._connect_wlk())
+
+    async def _take_ws(self):
+        """Return a connected WLK websocket, reusing the pre-opened one if still open"""
+        task, self._spare_ws_task = self._spare_ws_task, None
+        if task is not None:
+            try:
+                ws = await task
+                if ws.close_code is None:
+                    return ws
+            except Exception as e:
+                print(f"[WLK] pre-opened websocket unusable: {e}", file=sys.stderr, flush=True)
+        return await self._connect_wlk()
+
+    async def close_spare_ws(self):
+        """Close the pre-opened WLK websocket, if any, and stop pre-opening"""
+        self._spare_ws_closed = True
+        task, self._spare_ws_task = self._spare_ws_task, None
+        if task is None:
+            return
+        task.cancel()
+        try:
+            ws = await task
+        except (asyncio.CancelledError, Exception):
+            return
+        await ws.close()
+
+    async def _aec_cancel(self, mic: np.ndarray, ref: np.ndarray) -> np.ndarray:
+        """
+        Run one AEC frame on the AEC thread so the filter never blocks the
+        event loop (ctypes releases the GIL for the native call). A single
+        worker serializes calls, so SpeexAEC's reused output buffer is safe
+        as long as each caller copies it before the next await.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._aec_executor, self.aec.cancel, mic, ref)
+
     def _is_muted(self) -> bool:
-        return self.state.get("MUTED", "false").lower() == "true"
+        return self.state.muted
 
-    async def speak(self, text: str) -> int | None:
+    async def speak(self, text: str) -> asyncio.subprocess.Process | None:
         """
-        Speak text via macOS `say`. Returns PID if successful, None if failed.
+        Speak text via macOS `say`. Returns the process if successful, None if failed.
         """
         self.state.set(STATUS="speaking")
         self.logger.log_event("TTS_START", {"text": text, "voice": self.voice})
@@ -449,7 +905,7 @@ class AudioEngine:
                 stdout=asyncio.subprocess.DEVNULL,
                 stderr=asyncio.subprocess.DEVNULL,
             )
-            return proc.pid
+            return proc
         except Exception as e:
             print(f"TTS failed: {e}", file=sys.stderr)
             return None
@@ -523,14 +979,9 @@ class AudioEngine:
         if buffered and buffered not in ("(silence)", "(muted)"):
             self.logger.log_event("BUFFER_HIT", {"buffered_text": buffered})
             # User already spoke — just do TTS, no capture needed
-            pid = await self.speak(text)
-            if pid:
-                while True:
-                    try:
-                        os.kill(pid, 0)
-                        await asyncio.sleep(0.1)
-                    except ProcessLookupError:
-                        break
+            proc = await self.speak(text)
+            if proc:
+                await proc.wait()
             self.state.set(STATUS="idle")
             return buffered
 
@@ -540,130 +991,76 @@ class AudioEngine:
         async with self.lock:
             if self._is_muted():
                 # Still speak, but don't capture
-                pid = await self.speak(text)
-                if pid:
+                proc = await self.speak(text)
+                if proc:
                     # Wait for TTS to finish
-                    while True:
-                        try:
-                            os.kill(pid, 0)
-                            await asyncio.sleep(0.1)
-                        except ProcessLookupError:
-                            break
+                    await proc.wait()
                 return "(muted)"
 
             # Start TTS
-            tts_pid = await self.speak(text)
-            if not tts_pid:
+            tts_proc = await self.speak(text)
+            if not tts_proc:
                 return "(silence)"
 
             # Capture with barge-in
             self.state.set(STATUS="speaking+listening")
             try:
-                return await self._capture_utterance(tts_pid=tts_pid, tts_text=text)
+                return await self._capture_utterance(tts_proc=tts_proc, tts_text=text)
             finally:
                 self.state.set(STATUS="idle")
 
-    async def _capture_utterance(self, tts_pid: int = 0, tts_text: str = "") -> str:
+    async def _capture_utterance(
+        self, tts_proc: asyncio.subprocess.Process | None = None, tts_text: str = ""
+    ) -> str:
         """
         Core capture logic: streams mic to WLK, handles barge-in, returns text.
         """
-        # Health check: wait for WLK to be ready before connecting
-        wlk_port = self.config.get_int("WLK_PORT", 8090)
-        for attempt in range(10):
-            try:
-                reader, writer = await asyncio.wait_for(
-                    asyncio.open_connection("localhost", wlk_port), timeout=2.0
-                )
-                writer.close()
-                await writer.wait_closed()
-                if attempt > 0:
-                    print(f"[WLK] ready after {attempt + 1} attempts", file=sys.stderr, flush=True)
-                break
-            except (asyncio.TimeoutError, OSError) as e:
-                print(f"[WLK] health check attempt {attempt + 1}/10 failed: {e}", file=sys.stderr, flush=True)
-                if attempt == 9:
-                    print(f"[WLK] not reachable after 10 attempts, giving up", file=sys.stderr, flush=True)
-                    return "(wlk_error)"
-                await asyncio.sleep(1.0)
+        # Health check: no-op while WLK is known ready, probes only during (re)start
+        if not await self.wlk_manager.ensure_ready():
+            print(f"[WLK] not reachable after 10s, giving up", file=sys.stderr, flush=True)
+            return "(wlk_error)"
 
         try:
-            ws = await asyncio.wait_for(
-                websockets.connect(self.wlk_url), timeout=10.0
-            )
+            ws = await self._take_ws()
             print(f"[WLK] websocket connected", file=sys.stderr, flush=True)
         except (asyncio.TimeoutError, OSError) as e:
             print(f"[WLK] websocket connect failed: {e}", file=sys.stderr, flush=True)
+            # Force a fresh probe next time (e.g. an external WLK went away)
+            self.wlk_manager.ready_event.clear()
             return "(wlk_error)"
 
         text_result = ""
         last_text_change = 0.0
         got_text = False
-        frame_size = int(self.sample_rate * 0.1)  # 100ms chunks
 
         # TTS monitoring
-        tts_active = tts_pid > 0
+        tts_active = tts_proc is not None
         tts_done_event = asyncio.Event()
         if not tts_active:
             tts_done_event.set()
 
-        # Re-query system default input if in auto mode (user may have switched)
-        if self._auto_device:
-            new_default = sd.default.device[0]
-            if new_default is not None and int(new_default) != self.device_index:
-                dev = sd.query_devices(int(new_default))
-                print(f"  Input device changed: [{int(new_default)}] {dev['name']}")
-                self.device_index = int(new_default)
-
         # Barge-in state
         barge_in_enabled = tts_active and self.barge_in_enabled and self.blackhole_device is not None
         barge_in_triggered = False
 
         loop = asyncio.get_event_loop()
-        audio_queue: asyncio.Queue = asyncio.Queue()
-        ref_queue: asyncio.Queue = asyncio.Queue()
+        # 160 x 20ms blocks = 3.2s of slack before the oldest is overwritten
+        audio_ring = FrameRing(loop, self.block_size, slots=160)
+        ref_ring = FrameRing(loop, self.block_size, slots=160)
         done_event = asyncio.Event()
+        text_changed = asyncio.Event()
 
-        def audio_callback(indata, frames, time_info, status):
-            boosted = np.clip(indata.astype(np.float64) * self.gain, -32768, 32767).astype(np.int16)
-            loop.call_soon_threadsafe(audio_queue.put_nowait, boosted)
-
-        def ref_callback(indata, frames, time_info, status):
-            loop.call_soon_threadsafe(ref_queue.put_nowait, indata.copy())
-
-        # Mic stream
-        mic_stream = sd.InputStream(
-            device=self.device_index,
-            samplerate=self.sample_rate,
-            channels=1,
-            dtype="int16",
-            blocksize=frame_size,
-            callback=audio_callback,
-        )
-
-        # Reference stream (BlackHole) - only if barge-in enabled
-        ref_stream = None
-        if barge_in_enabled:
-            ref_stream = sd.InputStream(
-                device=self.blackhole_device,
-                samplerate=self.sample_rate,
-                channels=1,
-                dtype="int16",
-                blocksize=frame_size,
-                callback=ref_callback,
-            )
+        # Persistent streams stay open across captures; frames are routed here
+        # only while a target is attached, otherwise the callbacks drop them
+        self._open_streams(with_ref=barge_in_enabled)
 
         async def tts_monitor():
-            """Poll TTS process until it exits"""
+            """Wait for the TTS process to exit (asyncio's child watcher wakes us)"""
             if not tts_active:
                 return
-            while not done_event.is_set():
-                try:
-                    os.kill(tts_pid, 0)
-                except ProcessLookupError:
-                    self.logger.log_event("TTS_STOPPED_NATURAL", {"pid": tts_pid})
-                    tts_done_event.set()
-                    return
-                await asyncio.sleep(0.05)
+            await tts_proc.wait()
+            self.logger.log_event("TTS_STOPPED_NATURAL", {"pid": tts_proc.pid})
+            tts_done_event.set()
 
         async def barge_in_monitor():
             """Adaptive barge-in: calibrates mic baseline during TTS, detects speech above it.
@@ -676,83 +1073,108 @@ class AudioEngine:
             if tts_done_event.is_set():
                 return
 
-            # Unified calibration + detection loop
-            CALIBRATION_FRAMES = 8  # ~0.8s at 100ms/frame
-            baseline_rms: list[float] = []
-            buffered_mic_frames: list[np.ndarray] = []
+            # Unified calibration + detection loop. Thresholds were tuned on
+            # 100ms frames, so 20ms blocks are aggregated into 100ms windows.
+            CALIBRATION_WINDOWS = 8  # ~0.8s
+            BASELINE_EMA_ALPHA = 0.05  # post-calibration drift tracking
+            baseline_sum = 0.0
+            baseline = 0.0
+            # Only the last 3 windows (~300ms) are replayed after a trigger,
+            # so keep just those blocks in a preallocated ring
+            replay_blocks = np.empty((3 * self.blocks_per_window, self.block_size), dtype=np.int16)
+            replay_count = 0
             spike_count = 0
-            frame_count = 0
+            window_count = 0
+            window_ss = 0
+            window_blocks = 0
             threshold = 0.0
 
+            def threshold_for(baseline: float) -> float:
+                # With AEC: residual is low (~50-180), speech adds ~200-500 on top
+                # Without AEC: raw bleed is high (~300-800), speech adds ~500-1000
+                if self.aec is not None:
+                    return max(baseline * 3.0, 400)
+                return max(baseline * 2.5, 1200)
+
             while not done_event.is_set() and not tts_done_event.is_set():
-                mic_frame = None
-                while not audio_queue.empty():
-                    mic_frame = audio_queue.get_nowait()
+                # Wake on the next mic block rather than polling
+                await audio_ring.wait_ready()
+                if tts_done_event.is_set():
+                    break
+                mic_frame = audio_ring.get_nowait()
 
                 if mic_frame is None:
-                    await asyncio.sleep(0.05)
                     continue
 
-                # Apply AEC if available: cancel TTS echo from mic signal
+                # Apply AEC if available: cancel TTS echo from mic signal.
+                # Speex adapts on a continuous reference, so pair each mic
+                # block with the next reference block in order; skip AEC
+                # rather than reuse or jump over reference frames
                 if self.aec is not None:
-                    ref_frame = None
-                    while not ref_queue.empty():
-                        ref_frame = ref_queue.get_nowait()
+                    ref_frame = ref_ring.get_nowait()
                     if ref_frame is not None:
                         try:
-                            mic_frame = self.aec.cancel(mic_frame.flatten(), ref_frame.flatten())
-                            mic_frame = mic_frame.reshape(-1, 1)
+                            mic_frame = await self._aec_cancel(mic_frame, ref_frame)
                         except Exception:
                             pass
 
-                buffered_mic_frames.append(mic_frame)
-                mic_rms = float(np.sqrt(np.mean(mic_frame.astype(np.float64) ** 2)))
-                frame_count += 1
+                # Keep a copy: ring slots and the AEC output get reused
+                np.copyto(replay_blocks[replay_count % len(replay_blocks)], mic_frame)
+                replay_count += 1
+                window_ss += sum_squares(mic_frame)
+                window_blocks += 1
+                if window_blocks < self.blocks_per_window:
+                    continue
+                mic_rms = math.sqrt(window_ss / (window_blocks * self.block_size))
+                window_ss = 0
+                window_blocks = 0
+                window_count += 1
 
                 # Calibration: measure mic RMS during TTS (speaker bleed baseline)
-                if frame_count <= CALIBRATION_FRAMES:
-                    baseline_rms.append(mic_rms)
-                    if frame_count == CALIBRATION_FRAMES:
-                        baseline = sum(baseline_rms) / len(baseline_rms)
-                        # With AEC: residual is low (~50-180), speech adds ~200-500 on top
-                        # Without AEC: raw bleed is high (~300-800), speech adds ~500-1000
-                        if self.aec is not None:
-                            threshold = max(baseline * 3.0, 400)
-                        else:
-                            threshold = max(baseline * 2.5, 1200)
+                if window_count <= CALIBRATION_WINDOWS:
+                    baseline_sum += mic_rms
+                    if window_count == CALIBRATION_WINDOWS:
+                        baseline = baseline_sum / CALIBRATION_WINDOWS
+                        threshold = threshold_for(baseline)
                         print(f"[BARGE-IN] calibrated: baseline={baseline:.0f} threshold={threshold:.0f}", file=sys.stderr, flush=True)
-                    await asyncio.sleep(0.05)
                     continue
 
-                # Detection — log every 5th frame for tuning visibility
-                if frame_count % 5 == 0:
+                # Detection — log every 5th window for tuning visibility
+                if window_count % 5 == 0:
                     print(f"[BARGE-IN] rms={mic_rms:.0f} thr={threshold:.0f} spk={spike_count}", file=sys.stderr, flush=True)
                 if mic_rms > threshold:
                     spike_count += 1
                     print(f"[BARGE-IN] spike! mic_rms={mic_rms:.0f} threshold={threshold:.0f} spikes={spike_count}", file=sys.stderr, flush=True)
                 else:
                     spike_count = max(0, spike_count - 1)
+                    if spike_count == 0:
+                        # Quiet window: let the bleed baseline follow TTS loudness
+                        baseline += BASELINE_EMA_ALPHA * (mic_rms - baseline)
+                        threshold = threshold_for(baseline)
 
                 if spike_count >= 4:
                     self.logger.log_event("BARGE_IN_DETECTED", {"mic_rms": mic_rms})
-                    print(f"BARGE-IN! mic_rms={mic_rms:.0f} (buffered {len(buffered_mic_frames)} frames for replay)", file=sys.stderr)
+                    print(f"BARGE-IN! mic_rms={mic_rms:.0f} (buffered {min(replay_count, len(replay_blocks))} blocks for replay)", file=sys.stderr)
                     barge_in_triggered = True
                     try:
-                        os.kill(tts_pid, signal.SIGTERM)
+                        tts_proc.terminate()
                     except ProcessLookupError:
                         pass
                     tts_done_event.set()
-                    # Only replay frames from the trigger point onward
-                    # Earlier frames are contaminated with TTS bleed
-                    replay_start = max(0, len(buffered_mic_frames) - 3)
-                    for frame in buffered_mic_frames[replay_start:]:
-                        audio_queue.put_nowait(frame)
-                    while not ref_queue.empty():
-                        ref_queue.get_nowait()
+                    # Replay the retained blocks oldest first; anything
+                    # earlier is contaminated with TTS bleed. Blocks queued
+                    # while the last frame was in AEC are newer, so take them
+                    # out (copied: pushing reuses their slots) and requeue
+                    # them after the replay to keep the audio in order
+                    newer = [frame.copy() for frame in iter(audio_ring.get_nowait, None)]
+                    n = len(replay_blocks)
+                    for i in range(max(0, replay_count - n), replay_count):
+                        audio_ring.push(replay_blocks[i % n])
+                    for frame in newer:
+                        audio_ring.push(frame)
+                    ref_ring.clear()
                     return
 
-                await asyncio.sleep(0.05)
-
         async def send_audio():
             """Send mic audio to WLK"""
             await tts_done_event.wait()
@@ -763,57 +1185,68 @@ class AudioEngine:
                 # With AEC active we need less flush time
                 flush_delay = 0.5 if self.aec is not None else 1.5
                 await asyncio.sleep(flush_delay)
-                while not audio_queue.empty():
-                    audio_queue.get_nowait()
-                while not ref_queue.empty():
-                    ref_queue.get_nowait()
+                audio_ring.clear()
+                ref_ring.clear()
             if not barge_in_enabled:
-                mic_stream.start()
+                self._mic_target = audio_ring
 
             frame_count = 0
+            # Frames are copied straight from the ring into one preallocated
+            # buffer and sent as a memoryview once it holds send_chunk_bytes;
+            # websockets masks (copies) the payload before send() returns, so
+            # the buffer can be refilled right away. The persistent mic stream
+            # never goes quiet, so there is no idle flush (and no timer per
+            # block); a partial batch is flushed on the way out instead.
+            send_buf = memoryview(bytearray(self.send_chunk_bytes + self.block_size * 2))
+            filled = 0
             try:
                 while not done_event.is_set():
-                    try:
-                        data = await asyncio.wait_for(audio_queue.get(), timeout=0.5)
-                        # Apply AEC to clean residual echo from mic frames
-                        if self.aec is not None and not ref_queue.empty():
-                            ref_frame = None
-                            while not ref_queue.empty():
-                                ref_frame = ref_queue.get_nowait()
-                            if ref_frame is not None:
-                                try:
-                                    data = self.aec.cancel(data.flatten(), ref_frame.flatten())
-                                    data = data.reshape(-1, 1)
-                                except Exception:
-                                    pass
-                        await ws.send(data.tobytes())
-                        frame_count += 1
-                        if frame_count % 10 == 0:
-                            print(f"[DEBUG] Sent {frame_count} frames to WLK", file=sys.stderr, flush=True)
-                    except asyncio.TimeoutError:
-                        continue
+                    data = await audio_ring.get()
+                    # Apply AEC to clean residual echo from mic frames, one
+                    # reference block per mic block (see barge_in_monitor)
+                    if self.aec is not None:
+                        ref_frame = ref_ring.get_nowait()
+                        if ref_frame is not None:
+                            try:
+                                data = await self._aec_cancel(data, ref_frame)
+                            except Exception:
+                                pass
+                    send_buf[filled:filled + data.nbytes] = data.data.cast("B")
+                    filled += data.nbytes
+                    frame_count += 1
+                    if filled >= self.send_chunk_bytes:
+                        await ws.send(send_buf[:filled])
+                        filled = 0
+                    # Every 5s of audio, whatever the block size
+                    if frame_count % (50 * self.blocks_per_window) == 0:
+                        print(f"[DEBUG] Sent {frame_count} frames to WLK", file=sys.stderr, flush=True)
             finally:
+                # This task is normally cancelled once done_event is set, so
+                # the partial batch can only be flushed here; the socket is
+                # still open until the capture's `async with ws` exits
+                if filled:
+                    try:
+                        await ws.send(send_buf[:filled])
+                    except (asyncio.CancelledError, websockets.exceptions.ConnectionClosed):
+                        pass
                 print(f"[DEBUG] Audio send complete, sent {frame_count} frames total", file=sys.stderr, flush=True)
                 if not barge_in_enabled:
-                    mic_stream.stop()
+                    self._mic_target = None
 
         async def recv_transcription():
             """Receive and accumulate transcription from WLK"""
             nonlocal text_result, last_text_change, got_text
-            idle_since = time.monotonic()
-            msg_count = 0
+            last_msg = None
 
+            # One timer per message: this task is cancelled as soon as
+            # done_event is set, so it never has to wake up to check it
             while not done_event.is_set():
                 try:
-                    msg = await asyncio.wait_for(ws.recv(), timeout=0.5)
-                    idle_since = time.monotonic()
-                    msg_count += 1
+                    msg = await asyncio.wait_for(ws.recv(), timeout=10.0)
                 except asyncio.TimeoutError:
-                    if time.monotonic() - idle_since > 10.0:
-                        print("[WLK] unresponsive for 10s, ending capture", file=sys.stderr, flush=True)
-                        done_event.set()
-                        return
-                    continue
+                    print("[WLK] unresponsive for 10s, ending capture", file=sys.stderr, flush=True)
+                    done_event.set()
+                    return
                 except websockets.exceptions.ConnectionClosed as e:
                     print(f"[WLK] connection closed during recv: code={e.code} reason='{e.reason}'", file=sys.stderr, flush=True)
                     if got_text and text_result:
@@ -821,19 +1254,28 @@ class AudioEngine:
                     done_event.set()
                     return
 
-                d = json.loads(msg)
-                lines_text = " ".join(l.get("text", "") for l in d.get("lines", [])).strip()
+                # WLK only sends JSON text frames; resent state changes nothing
+                if not isinstance(msg, str) or msg == last_msg:
+                    continue
+                last_msg = msg
+                # Status/config frames carry no transcript; don't decode them
+                if '"text"' not in msg and '"buffer_transcription"' not in msg:
+                    continue
+
+                d = json_loads(msg)
+                lines_text = " ".join([l["text"] for l in d.get("lines") or () if l.get("text")]).strip()
                 buffer_text = d.get("buffer_transcription", "").strip()
                 combined = (lines_text + " " + buffer_text).strip()
 
-                # Filter hallucinations (exact and partial matches)
-                import re
-                combined = re.sub(r'\[(?:Music|INAUDIBLE|BLANK_AUDIO|BLANK[^\]]*)\]?', '', combined, flags=re.IGNORECASE)
-                combined = combined.strip()
+                # Filter hallucinations (exact and partial matches); every marker
+                # starts with "[", so clean text skips the regex engine
+                if "[" in combined:
+                    combined = HALLUCINATION_RE.sub("", combined).strip()
 
                 if combined and combined != text_result:
                     text_result = combined
                     last_text_change = time.monotonic()
+                    text_changed.set()
                     print(f"[DEBUG] WLK transcription: '{combined}'", file=sys.stderr, flush=True)
                     if not got_text:
                         got_text = True
@@ -842,6 +1284,11 @@ class AudioEngine:
                     else:
                         self.logger.log_event("TRANSCRIPTION_UPDATE", {"text": combined})
 
+        async def shutdown_watch():
+            """End the capture early if the server is shutting down"""
+            await self.shutdown_event.wait()
+            done_event.set()
+
         async def monitor():
             """Check for end-of-utterance"""
             await tts_done_event.wait()
@@ -849,17 +1296,23 @@ class AudioEngine:
             # After barge-in, user is mid-thought — give them more silence leeway
             effective_timeout = self.silence_timeout * 2 if barge_in_triggered else self.silence_timeout
 
+            deadline = capture_start + self.max_duration
+
+            # Sleep until the silence timeout or max duration would expire,
+            # waking early on each transcription change to re-arm the timer
             while not done_event.is_set():
-                await asyncio.sleep(0.3)
                 now = time.monotonic()
 
-                if now - capture_start > self.max_duration:
+                if now >= deadline:
                     done_event.set()
                     return
 
+                wait = deadline - now
                 if got_text and last_text_change > 0:
                     idle_time = now - last_text_change
-                    if idle_time >= effective_timeout and len(text_result) >= 2:
+                    if idle_time < effective_timeout:
+                        wait = min(wait, effective_timeout - idle_time)
+                    elif len(text_result) >= 2:
                         self.logger.log_event("CAPTURE_END", {
                             "text": text_result,
                             "silence_duration": idle_time,
@@ -867,10 +1320,16 @@ class AudioEngine:
                         done_event.set()
                         return
 
-        # Start streams
+                text_changed.clear()
+                try:
+                    await asyncio.wait_for(text_changed.wait(), timeout=wait)
+                except asyncio.TimeoutError:
+                    pass
+
+        # Route mic + reference frames during TTS for barge-in
         if barge_in_enabled:
-            mic_stream.start()
-            ref_stream.start()
+            self._mic_target = audio_ring
+            self._ref_target = ref_ring
 
         try:
             async with ws:
@@ -880,21 +1339,16 @@ class AudioEngine:
                     asyncio.create_task(send_audio()),
                     asyncio.create_task(recv_transcription()),
                     asyncio.create_task(monitor()),
+                    asyncio.create_task(shutdown_watch()),
                 ]
                 await done_event.wait()
                 for t in tasks:
                     t.cancel()
                 await asyncio.gather(*tasks, return_exceptions=True)
         finally:
-            if barge_in_enabled:
-                mic_stream.stop()
-                mic_stream.close()
-                if ref_stream:
-                    ref_stream.stop()
-                    ref_stream.close()
-            elif mic_stream.active:
-                mic_stream.stop()
-                mic_stream.close()
+            self._mic_target = None
+            self._ref_target = None
+            self._prewarm_ws()
 
         # Echo filter: strip TTS bleed from transcription
         if tts_text and text_result:
@@ -906,27 +1360,34 @@ class AudioEngine:
     def _strip_tts_echo(transcription: str, tts_text: str) -> str:
         """Remove fragments of TTS text that bled into the transcription.
         Handles partial matches — echo may start mid-sentence of TTS text."""
-        tts_words = tts_text.lower().split()
-        trans_words = transcription.lower().split()
+        # Normalize once: lowercase, punctuation removed. Translate per word
+        # (not the whole string) so indices still line up with
+        # transcription.split() when a token is punctuation only
+        tts_words = [w.translate(ECHO_PUNCT_TABLE) for w in tts_text.lower().split()]
+        trans_words = [w.translate(ECHO_PUNCT_TABLE) for w in transcription.lower().split()]
 
         if len(trans_words) < 3 or len(tts_words) < 3:
             return transcription
 
         # Find the longest run of consecutive TTS words at the start of transcription
         # The echo might start from any word in the TTS text (mic may miss first words)
+        # Only TTS positions sharing the transcription's first word can anchor a run,
+        # so this is one pass over the TTS words plus the extensions from those anchors
         best_match_len = 0  # number of transcription words matched
+        first = trans_words[0]
+        max_len = len(trans_words)
 
-        for tts_start in range(len(tts_words)):
-            match_len = 0
-            for j in range(min(len(trans_words) - match_len, len(tts_words) - tts_start)):
-                tw = trans_words[match_len].rstrip(".,!?;:-—'\"")
-                sw = tts_words[tts_start + j].rstrip(".,!?;:-—'\"")
-                if tw == sw:
-                    match_len += 1
-                else:
-                    break
+        for tts_start, word in enumerate(tts_words):
+            if word != first:
+                continue
+            match_len = 1
+            limit = min(max_len, len(tts_words) - tts_start)
+            while match_len < limit and trans_words[match_len] == tts_words[tts_start + match_len]:
+                match_len += 1
             if match_len > best_match_len:
                 best_match_len = match_len
+                if best_match_len == max_len:
+                    break
 
         if best_match_len >= 3:
             # Strip matched echo words, keep the rest
@@ -941,8 +1402,8 @@ class AudioEngine:
 
         # Fuzzy check: if >50% of transcription words appear in TTS text, likely echo
         if len(trans_words) >= 4:
-            tts_word_set = set(w.rstrip(".,!?;:-—'\"") for w in tts_words)
-            match_count = sum(1 for w in trans_words if w.rstrip(".,!?;:-—'\"") in tts_word_set)
+            tts_word_set = set(tts_words)
+            match_count = sum(1 for w in trans_words if w in tts_word_set)
             match_ratio = match_count / len(trans_words)
             if match_ratio > 0.5:
                 print(f"[ECHO-FILTER] fuzzy match {match_ratio:.0%} ({match_count}/{len(trans_words)} words), treating as echo", file=sys.stderr, flush=True)
@@ -971,6 +1432,7 @@ class StatusResponse(BaseModel):
     blackhole_device: int | None = None
     auto_device: bool = False
     voice: str = ""
+    wlk_ready: bool = False
 
 
 class TextResponse(BaseModel):
@@ -982,46 +1444,72 @@ config = Config()
 state = StateManager()
 log_file = Path.home() / ".claude-talk/audio-server.log"
 event_logger = EventLogger(log_file)
-audio_engine = AudioEngine(config, state, event_logger)
 wlk_manager = WLKManager(config)
+audio_engine = AudioEngine(config, state, event_logger, wlk_manager)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Startup and shutdown"""
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, _handle_exit_signal, sig)
+        except NotImplementedError:
+            pass  # no loop signal handlers on this platform; uvicorn's stay
     state.set(SESSION="active", STATUS="idle", MUTED="false")
+    event_logger.start()
     await wlk_manager.start()
     # Wait for WLK to be ready
-    for _ in range(30):
-        try:
-            reader, writer = await asyncio.wait_for(
-                asyncio.open_connection("localhost", config.get_int("WLK_PORT", 8090)),
-                timeout=1.0,
-            )
-            writer.close()
-            await writer.wait_closed()
-            print("WLK ready")
-            break
-        except (asyncio.TimeoutError, OSError):
-            await asyncio.sleep(1)
+    try:
+        await asyncio.wait_for(wlk_manager.ready_event.wait(), timeout=30)
+        print("WLK ready")
+    except asyncio.TimeoutError:
+        pass
     yield
+    audio_engine.shutdown_event.set()
+    await audio_engine._cancel_buffer()
+    await audio_engine.close_spare_ws()
     await wlk_manager.stop()
+    if audio_engine._aec_executor is not None:
+        # Drop queued AEC jobs so none runs against the torn-down engine
+        audio_engine._aec_executor.shutdown(wait=False, cancel_futures=True)
+    audio_engine.close_streams()
     state.set(SESSION="stopped")
+    state.flush()
+    event_logger.close()
+
+
+def _handle_exit_signal(sig: signal.Signals):
+    """
+    SIGINT/SIGTERM: end any capture in flight so uvicorn isn't left waiting
+    on a long /listen, then hand over to uvicorn's own graceful exit, which
+    runs the lifespan shutdown (closes streams, stops WLK).
+    """
+    print(f"Received {sig.name}, shutting down", file=sys.stderr, flush=True)
+    audio_engine.shutdown_event.set()
+    if server is not None:
+        server.handle_exit(sig, None)
 
 
 app = FastAPI(lifespan=lifespan)
+server: uvicorn.Server | None = None
 
 
 @app.get("/status")
 async def get_status() -> StatusResponse:
     """Get current server state with device and barge-in info"""
-    import sounddevice as sd
-    input_dev = sd.query_devices(audio_engine.device_index)
+    devices = query_devices_cached()
+    input_dev = devices[audio_engine.device_index]
     default_out = sd.default.device[1]
-    output_dev = sd.query_devices(int(default_out)) if default_out is not None else {}
+    # PortAudio reports "no default output" as -1, which would index the
+    # last device in the list
+    if default_out is None or int(default_out) < 0:
+        default_out = None
+    output_dev = devices[int(default_out)] if default_out is not None else {}
     return StatusResponse(
         state=state.get("STATUS", "idle"),
-        muted=state.get("MUTED", "false") == "true",
+        muted=state.muted,
         input_device=input_dev.get("name", "unknown"),
         input_device_index=audio_engine.device_index,
         output_device=output_dev.get("name", "unknown"),
@@ -1030,6 +1518,7 @@ async def get_status() -> StatusResponse:
         blackhole_device=audio_engine.blackhole_device,
         auto_device=audio_engine._auto_device,
         voice=audio_engine.voice,
+        wlk_ready=wlk_manager.ready_event.is_set(),
     )
 
 
@@ -1062,20 +1551,12 @@ async def speak(req: SpeakRequest) -> TextResponse:
 @app.get("/devices")
 async def get_devices() -> dict:
     """List audio devices with active input/output info"""
-    devices = sd.query_devices()
-    device_list = []
-    for i, dev in enumerate(devices):
-        device_list.append({
-            "index": i,
-            "name": dev["name"],
-            "input_channels": dev["max_input_channels"],
-            "output_channels": dev["max_output_channels"],
-        })
+    device_list = device_list_cached()
     default_in, default_out = sd.default.device
     return {
         "devices": device_list,
         "active_input": audio_engine.device_index,
-        "active_input_name": devices[audio_engine.device_index]["name"],
+        "active_input_name": device_list[audio_engine.device_index]["name"],
         "default_input": int(default_in) if default_in is not None else None,
         "default_output": int(default_out) if default_out is not None else None,
     }
@@ -1110,6 +1591,7 @@ async def stop():
     """Graceful shutdown"""
     await wlk_manager.stop()
     state.set(SESSION="stopped")
+    state.flush()
     # Give time for response to be sent
     asyncio.create_task(_delayed_exit())
     return {"status": "shutting down"}
@@ -1126,9 +1608,14 @@ async def _delayed_exit():
 
 
 def main():
-    port = config.get_int("AUDIO_SERVER_PORT", 8150)
+    port = config.audio_server_port
     print(f"Starting audio server on port {port}")
-    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning")
+    # loop="auto" picks uvloop when it is installed, else the stock asyncio loop
+    global server
+    server = uvicorn.Server(
+        uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", loop="auto")
+    )
+    server.run()
 
 
 if __name__ == "__main__":